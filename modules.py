@@ -1,19 +1,26 @@
 from dataclasses import dataclass
 from typing import Callable, Any, get_origin, get_args, Literal, get_type_hints
+from collections import OrderedDict
 import inspect
+import json
+import time
 from datetime import datetime
+from decimal import Decimal
 
 @dataclass
 class Tool:
     name: str
     description: str
-    func: Callable[..., str]
+    func: Callable[..., Any]
     parameters: dict[str, dict[str, str]]
+    cache_ttl: float | None = None  # seconds a result may be reused; None for impure tools, float('inf') for pure ones
+    cache_key: Callable[..., Any] | None = None  # maps the tool arguments to the values that identify a call
 
     def __repr__(self):
         return (f"Tool(name={self.name!r}, description={self.description!r},\n"
                 f"func={self.func},\n"
-                f"parameters={self.parameters})")
+                f"parameters={self.parameters},\n"
+                f"cache_ttl={self.cache_ttl}, cache_key={self.cache_key})")
     
     def __call__(self, *args, **kwds):
         return self.func(*args, **kwds)
@@ -52,6 +59,8 @@ def parse_docstring_params(docstring: str) -> dict[str, str]:
         line = lines[i].strip()
         if not line:
             continue
+        if line.endswith(':') and not line.startswith('-'):  # next section, e.g. "Returns:"
+            break
         line = line.lstrip('-').strip()  # Safer: only strip dash at start
         name, description = line.split(':', 1)  # Avoid unpacking error
         params[name.strip()] = description.strip()
@@ -92,8 +101,10 @@ def get_type_description(type_hint: Any) -> str:
     
 
 # Define a decorator called "tool", which convert each function into a Tool instance
-def tool(name: str = None):
-    def decorator(func: Callable[..., str]) -> Tool:
+# Set cache_ttl to let the agent reuse results of identical calls for that many seconds, and cache_key
+# to treat calls as identical beyond exact argument equality (e.g. case-insensitive currency codes)
+def tool(name: str = None, cache_ttl: float | None = None, cache_key: Callable[..., Any] | None = None):
+    def decorator(func: Callable[..., Any]) -> Tool:
         # use function name or customized name as tool name
         tool_name = name or func.__name__   
         
@@ -120,13 +131,124 @@ def tool(name: str = None):
             name=tool_name, 
             description=description.split('\n\n')[0],  # use the first paragraph in docstring
             func=func,
-            parameters=params
+            parameters=params,
+            cache_ttl=cache_ttl,
+            cache_key=cache_key
         )
     return decorator
 
+class ToolCache:
+    """
+    Memoizes tool results, keyed on the tool name and its canonicalized arguments.
+
+    Only tools declaring a `cache_ttl` are cached. Numbers are compared by value (100 == 100.0), while
+    strings are case-sensitive unless the tool declares a `cache_key`. Least recently used entries are evicted
+    once `max_entries` is reached, and hit/miss counters are kept for monitoring.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def canonicalize(value: Any) -> Any:
+        """
+        Normalize numbers exactly, recursively, so that 100, 100.0 and Decimal("100") compare equal
+        while 10**17 and 10**17 + 1 stay distinct.
+        """
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float, Decimal)):
+            return str(Decimal(str(value)).normalize())
+        if isinstance(value, dict):
+            return {str(k): ToolCache.canonicalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [ToolCache.canonicalize(v) for v in value]
+        return value
+
+    @staticmethod
+    def make_key(tool_name: str, args: Any) -> tuple[str, str]:
+        """Canonicalize the arguments so that argument order, number formatting and JSON layout do not matter."""
+        return tool_name, json.dumps(ToolCache.canonicalize(args), sort_keys=True, default=str)
+
+    def get(self, key: tuple[str, str]) -> tuple[bool, Any]:
+        """Return (found, result) for a key, dropping the entry if it has expired."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if time.monotonic() < expires_at:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, result
+            del self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: tuple[str, str], result: Any, ttl: float) -> None:
+        self.entries[key] = (time.monotonic() + ttl, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "entries": len(self.entries)}
+
+
 @dataclass
 class Interaction:
     """Record of a single interaction with the agent"""
     timestamp: datetime
     query: str
-    plan: dict[str, Any]
\ No newline at end of file
+    plan: dict[str, Any]
+
+@dataclass(slots=True, frozen=True)
+class ConversionResult:
+    """Result of a currency conversion, kept exact until it is rendered"""
+    amount: Decimal
+    from_currency: str
+    to_currency: str
+    rate: Decimal
+    as_of: datetime
+    source: str
+
+    @property
+    def converted_amount(self) -> Decimal:
+        return self.amount * self.rate
+
+    def __str__(self):
+        return (f"{self.amount} {self.from_currency} = "
+                f"{self.converted_amount.quantize(Decimal('0.01'))} {self.to_currency}")
+
+
+@dataclass(slots=True, frozen=True)
+class WeatherResult:
+    """Daily weather report for a city, rendered to text only when displayed"""
+    city: str
+    country: str
+    date: str
+    temp_max: float
+    temp_min: float
+    condition: str
+    source: str
+
+    def __str__(self):
+        return (f"Weather in {self.city}, {self.country} on {self.date}:\n"
+                f" - Max Temp: {self.temp_max}°C\n"
+                f" - Min Temp: {self.temp_min}°C\n"
+                f" - Condition: {self.condition}")
+
+
+@dataclass(slots=True, frozen=True)
+class ToolError:
+    """Failure reported by a tool, returned instead of its result so callers can tell the two apart"""
+    message: str
+
+    def __str__(self):
+        return self.message
@@ -0,0 +1,258 @@
+from dataclasses import dataclass, field
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import urllib.parse
+import json
+
+
+class UnsupportedCurrency(ValueError):
+    """Raised when a provider answers but has no rates for the requested currency"""
+
+
+def fetch_json(url: str, timeout: float, unsupported_codes: tuple[int, ...] = ()) -> dict:
+    """
+    Fetch and parse a JSON document, keeping floats exact as Decimal.
+
+    The HTTP statuses in `unsupported_codes` are the ones a provider uses to reject an unknown currency
+    and raise UnsupportedCurrency. Any other HTTP error (e.g. 429 rate limiting, 401/403 auth or quota,
+    5xx), transport errors and timeouts propagate unchanged and count against the provider.
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read(), parse_float=Decimal)
+    except urllib.error.HTTPError as e:
+        if e.code in unsupported_codes:
+            raise UnsupportedCurrency(f"HTTP {e.code} from {url}") from e
+        raise
+
+
+class RateProvider:
+    """Base class of exchange rate backends"""
+    name: str = "provider"
+
+    def get_rates(self, base: str) -> tuple[dict[str, Decimal], datetime]:
+        """
+        Fetch the exchange rates of one currency.
+
+        Args:
+            base (str): Upper-case currency code to convert from (e.g., USD).
+
+        Returns:
+            tuple[dict[str, Decimal], datetime]: Rates keyed by target currency code, and the time they were published.
+
+        Raises:
+            UnsupportedCurrency: If the provider has no rates for the base currency.
+        """
+        raise NotImplementedError
+
+
+class OpenERAPIProvider(RateProvider):
+    """Rates from open.er-api.com"""
+    name = "open.er-api.com"
+
+    def __init__(self, base_url: str = "https://open.er-api.com/v6/latest", timeout: float = 10):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def get_rates(self, base: str) -> tuple[dict[str, Decimal], datetime]:
+        data = fetch_json(f"{self.base_url}/{urllib.parse.quote(base)}", self.timeout, unsupported_codes=(404,))
+
+        if 'rates' not in data:  # e.g. {"result": "error", "error-type": "unsupported-code"}
+            raise UnsupportedCurrency(f"No rates for {base}: {data.get('error-type', 'unknown error')}")
+        if 'time_last_update_unix' not in data:  # never guess when the rates were published
+            raise ValueError("Response has no time_last_update_unix")
+        return data['rates'], datetime.fromtimestamp(data['time_last_update_unix'], tz=timezone.utc)
+
+
+class FrankfurterProvider(RateProvider):
+    """Rates from the European Central Bank, served by frankfurter.app"""
+    name = "frankfurter.app"
+
+    def __init__(self, base_url: str = "https://api.frankfurter.app", timeout: float = 10):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def get_rates(self, base: str) -> tuple[dict[str, Decimal], datetime]:
+        data = fetch_json(f"{self.base_url}/latest?from={urllib.parse.quote(base)}", self.timeout,
+                          unsupported_codes=(404, 422))
+
+        if 'rates' not in data:
+            raise UnsupportedCurrency(f"No rates for {base}")
+        as_of = datetime.strptime(data['date'], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        return data['rates'], as_of
+
+
+class FileRateProvider(RateProvider):
+    """
+    Rates from a local JSON file, mapping each base currency to its rates:
+    ```
+    {"USD": {"EUR": 0.92, "JPY": 142.5}, "EUR": {"USD": 1.09}}
+    ```
+    The modification time of the file is used as the publication time.
+    """
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def get_rates(self, base: str) -> tuple[dict[str, Decimal], datetime]:
+        with open(self.path, 'r') as json_file:
+            data = json.load(json_file, parse_float=Decimal)
+
+        if base not in data:
+            raise UnsupportedCurrency(f"No rates for {base} in {self.path}")
+        return data[base], datetime.fromtimestamp(os.path.getmtime(self.path), tz=timezone.utc)
+
+
+@dataclass
+class ProviderStats:
+    """Recent latencies and circuit breaker state of a single provider"""
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100))
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_failure: float = 0.0
+
+    def p95(self) -> float | None:
+        """95th percentile of recent successful latencies in seconds, None until enough samples exist."""
+        if len(self.latencies) < 5:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def is_open(self, failure_threshold: int, reset_timeout: float) -> bool:
+        """Whether the circuit is open, i.e. the provider should not be called."""
+        return (self.consecutive_failures >= failure_threshold
+                and time.monotonic() - self.last_failure < reset_timeout)
+
+
+class RateSource:
+    """
+    Fetches exchange rates from several providers.
+
+    Providers are tried fastest first, ranked by their p95 latency. If a provider has not answered
+    within its p95 budget, a hedged request is fired at the next one and the first success wins.
+    A provider that fails, or that does not quote the target currency, hands over to the next one
+    immediately. After `failure_threshold` consecutive transport failures (unknown currencies do not
+    count) a provider's circuit opens and it is skipped for `reset_timeout` seconds.
+
+    Requests run on daemon threads, so a losing hedge still waiting on the network never blocks
+    interpreter exit. With `cache_ttl` set, the rates of each base currency are reused for that many
+    seconds, so converting other amounts or other targets from the same currency skips the network.
+    """
+
+    def __init__(self, providers: list[RateProvider], hedge_after: float = 1.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0, cache_ttl: float = 0.0):
+        if not providers:
+            raise ValueError("At least one rate provider is required")
+        self.providers = providers
+        self.hedge_after = hedge_after  # budget used until a provider has latency samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.cache_ttl = cache_ttl
+        self._cache: dict[str, tuple[float, dict[str, Decimal], datetime, str]] = {}  # base -> (expires_at, rates, as_of, name)
+        self.stats: dict[str, ProviderStats] = {provider.name: ProviderStats() for provider in providers}
+        self._lock = threading.Lock()
+
+    def _budget(self, provider: RateProvider) -> float:
+        p95 = self.stats[provider.name].p95()
+        return self.hedge_after if p95 is None else p95
+
+    def _ranked(self) -> list[RateProvider]:
+        with self._lock:
+            healthy = [provider for provider in self.providers
+                       if not self.stats[provider.name].is_open(self.failure_threshold, self.reset_timeout)]
+            # when every circuit is open, try them all anyway rather than failing outright
+            return sorted(healthy or self.providers, key=self._budget)
+
+    def _fetch(self, provider: RateProvider, base: str, results: queue.Queue) -> None:
+        start = time.monotonic()
+        try:
+            rates, as_of = provider.get_rates(base)
+        except UnsupportedCurrency as e:
+            results.put((provider, None, e))  # the provider is healthy, the currency is not
+            return
+        except Exception as e:
+            with self._lock:
+                stats = self.stats[provider.name]
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                stats.last_failure = time.monotonic()
+            results.put((provider, None, e))
+            return
+        with self._lock:
+            stats = self.stats[provider.name]
+            stats.latencies.append(time.monotonic() - start)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+        results.put((provider, (rates, as_of), None))
+
+    def get_rates(self, base: str, target: str) -> tuple[dict[str, Decimal], datetime, str]:
+        """
+        Fetch the exchange rates of one currency from the first provider to answer with the target currency.
+
+        Args:
+            base (str): Upper-case currency code to convert from (e.g., USD).
+            target (str): Upper-case currency code to convert to (e.g., EUR).
+
+        Returns:
+            tuple[dict[str, Decimal], datetime, str]: Rates keyed by target currency code, their publication time,
+            and the name of the provider that served them.
+
+        Raises:
+            UnsupportedCurrency: If every provider answered but none quotes base -> target.
+            RuntimeError: If no provider could be reached.
+        """
+        with self._lock:
+            cached = self._cache.get(base)
+        if cached is not None and time.monotonic() < cached[0] and target in cached[1]:
+            return cached[1:]
+
+        candidates = self._ranked()
+        results = queue.Queue()  # (provider, (rates, as_of) or None, exception or None)
+        errors = []
+        launched = 0
+        unsupported = True  # whether every miss so far is an unknown currency
+
+        def launch() -> float:
+            """Start the next provider and return the moment to hedge it."""
+            nonlocal launched
+            provider = candidates[launched]
+            launched += 1
+            threading.Thread(target=self._fetch, args=(provider, base, results),
+                             name=f"rate-source-{provider.name}", daemon=True).start()
+            return time.monotonic() + self._budget(provider)
+
+        hedge_at = launch()
+        while len(errors) < launched:
+            timeout = max(0.0, hedge_at - time.monotonic()) if launched < len(candidates) else None
+            try:
+                provider, result, error = results.get(timeout=timeout)
+            except queue.Empty:
+                hedge_at = launch()  # hedge: the last provider is slower than its p95
+                continue
+
+            if error is None:
+                rates, as_of = result
+                if target in rates:
+                    if self.cache_ttl:
+                        with self._lock:
+                            self._cache[base] = (time.monotonic() + self.cache_ttl, rates, as_of, provider.name)
+                    return rates, as_of, provider.name
+                error = UnsupportedCurrency(f"No rate for {base} -> {target}")
+
+            unsupported = unsupported and isinstance(error, UnsupportedCurrency)
+            errors.append(f"{provider.name}: {error}")
+            if len(errors) == launched and launched < len(candidates):
+                hedge_at = launch()  # fail over
+
+        if unsupported:
+            raise UnsupportedCurrency(f"No provider quotes {base} -> {target} ({'; '.join(errors)})")
+        raise RuntimeError(f"All rate providers failed ({'; '.join(errors)})")
@@ -1,31 +1,56 @@
 import os
-from openai import OpenAI
+try:
+    from openai import OpenAI
+except ImportError:  # only needed to call the LLM, tools and caching work without it
+    OpenAI = None
 from pprint import pprint
 from utils import *
 from typing import List, Any
-from modules import Interaction, Tool
+from modules import Interaction, Tool, ToolCache, ToolError
 from datetime import datetime
 from tools import convert_currency
 
 class Agent:
     def __init__(self):
         """Initialize Agent with empty tool registry."""
+        if OpenAI is None:
+            raise ImportError("The openai package is required to run the agent: pip install openai")
         self.client = OpenAI(api_key=os.getenv("DEEPSEEK_API_KEY"), base_url="https://api.deepseek.com")
         self.tools: dict[str, Tool] = {}
         self.model = 'deepseek-chat'
         self.interactions: list[Interaction] = [] # working memory, new feature
+        self.tool_cache = ToolCache()  # results of cacheable tools, shared across queries
 
     def add_tools(self, tool: Tool) -> None:
         """Register a new tool with the agent."""
         self.tools[tool.name] = tool
 
-    def use_tool(self, tool_name: str, **kwargs: Any) -> str:
-        """Execute a specific tool with given arguments."""
+    def use_tool(self, tool_name: str, **kwargs: Any) -> Any:
+        """Execute a specific tool with given arguments, reusing cached results when the tool allows it."""
         if tool_name not in self.tools:
             raise ValueError(f"Tool '{tool_name}' not found. Available tools: {list(self.tools.keys())}")
         
         tool = self.tools[tool_name]
-        return tool.func(**kwargs)
+        if tool.cache_ttl is None:
+            return tool.func(**kwargs)
+
+        try:
+            key = self.tool_cache.make_key(tool_name, tool.cache_key(**kwargs) if tool.cache_key else kwargs)
+        except Exception:  # arguments the key cannot handle are left to the tool's own error handling
+            return tool.func(**kwargs)
+
+        found, result = self.tool_cache.get(key)
+        if found:
+            return result
+
+        result = tool.func(**kwargs)
+        if not isinstance(result, ToolError):  # only successful results are reused
+            self.tool_cache.put(key, result, tool.cache_ttl)
+        return result
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Hit/miss counters of the tool result cache."""
+        return self.tool_cache.stats()
     
     def create_system_prompt(self) -> str:
         """Create the system prompt for the LLM with available tools."""
@@ -277,7 +302,7 @@ Remember to use tools only when they are actually needed for the task."""
 - Initial Plan: {'. '.join(origin_plan['plan'])}
 - Reflection: {reflection.get('reflection', 'No improvements suggested')}
 - Final Plan: {'. '.join(final_plan['plan'])}
-- Results: {'. '.join(results)}"""
+- Results: {'. '.join(str(result) for result in results)}"""
 
             
 if __name__ == "__main__":
@@ -298,4 +323,6 @@ if __name__ == "__main__":
         result = agent.execute(query)
         print(">>> Response:")
         print(result)
+        stats = agent.cache_stats()
+        print(f">>> Tool cache: {stats['hits']} hits, {stats['misses']} misses (hit rate {stats['hit_rate']:.0%})")
         print("-" * 50)
\ No newline at end of file
@@ -1,6 +1,18 @@
 import unittest
+from unittest import mock
 from typing import Any
-from modules import parse_docstring_params, tool
+from datetime import datetime, timezone
+from decimal import Decimal
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import json
+import os
+import tempfile
+import threading
+import time
+from modules import parse_docstring_params, tool, ConversionResult, WeatherResult, ToolCache, ToolError
+from rate_providers import RateSource, OpenERAPIProvider, FileRateProvider, UnsupportedCurrency
+import run_agent
+import tools
 
 class TestParseDocstringParams(unittest.TestCase):
 
@@ -19,6 +31,18 @@ class TestParseDocstringParams(unittest.TestCase):
         result = parse_docstring_params(docstring)
         self.assertEqual(result, expected)
 
+    def test_stops_at_next_section(self):
+        docstring = """
+        Description.
+
+        Parameters:
+            - param1: First
+
+        Returns:
+            A string without a colon
+        """
+        self.assertEqual(parse_docstring_params(docstring), {'param1': 'First'})
+
     def test_empty_docstring(self):
         self.assertEqual(parse_docstring_params(''), {})
 
@@ -105,6 +129,323 @@ class TestToolDecorator(unittest.TestCase):
         self.assertEqual(do_something.name, "custom_tool")
         self.assertEqual(do_something.parameters["task"]["type"], "str")
         self.assertEqual(do_something.parameters["task"]["description"], "The task to perform")
+        self.assertIsNone(do_something.cache_ttl)
+
+    def test_tool_cache_ttl(self):
+        @tool(cache_ttl=60)
+        def double(x: int) -> int:
+            """Double a number.
+
+            Parameters:
+                - x: The number to double
+            """
+            return 2 * x
+
+        self.assertEqual(double.cache_ttl, 60)
+
+
+class TestToolCache(unittest.TestCase):
+
+    def test_key_ignores_argument_order(self):
+        self.assertEqual(ToolCache.make_key("convert_currency", {"amount": 100, "from_currency": "USD"}),
+                         ToolCache.make_key("convert_currency", {"from_currency": "USD", "amount": 100}))
+        self.assertNotEqual(ToolCache.make_key("convert_currency", {"amount": 100}),
+                            ToolCache.make_key("convert_currency", {"amount": 200}))
+
+    def test_key_normalizes_numbers(self):
+        self.assertEqual(ToolCache.make_key("tool", {"amount": 100}),
+                         ToolCache.make_key("tool", {"amount": 100.0}))
+        self.assertEqual(ToolCache.make_key("tool", {"amount": Decimal("100.00")}),
+                         ToolCache.make_key("tool", {"amount": 100}))
+        self.assertNotEqual(ToolCache.make_key("tool", {"flag": True}),
+                            ToolCache.make_key("tool", {"flag": 1}))
+
+    def test_key_keeps_exact_amounts_distinct(self):
+        self.assertNotEqual(ToolCache.make_key("tool", {"amount": 10**17}),
+                            ToolCache.make_key("tool", {"amount": 10**17 + 1}))
+        self.assertNotEqual(ToolCache.make_key("tool", {"amount": Decimal("0.1000000000000000001")}),
+                            ToolCache.make_key("tool", {"amount": 0.1}))
+
+    def test_hit_miss_and_expiry(self):
+        cache = ToolCache()
+        key = ToolCache.make_key("tool", {"x": 1})
+        self.assertEqual(cache.get(key), (False, None))
+        cache.put(key, 42, ttl=60)
+        self.assertEqual(cache.get(key), (True, 42))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+        cache.put(key, 42, ttl=0)
+        self.assertEqual(cache.get(key), (False, None))
+        self.assertNotIn(key, cache.entries)
+
+    def test_evicts_least_recently_used(self):
+        cache = ToolCache(max_entries=2)
+        for x in range(2):
+            cache.put(("tool", str(x)), x, ttl=60)
+        cache.get(("tool", "0"))
+        cache.put(("tool", "2"), 2, ttl=60)
+        self.assertEqual(list(cache.entries), [("tool", "0"), ("tool", "2")])
+
+class TestToolResults(unittest.TestCase):
+
+    def test_conversion_result_is_exact(self):
+        result = ConversionResult(
+            amount=Decimal("100.10"),
+            from_currency="USD",
+            to_currency="EUR",
+            rate=Decimal("0.923456"),
+            as_of=datetime(2025, 4, 20, tzinfo=timezone.utc),
+            source="test"
+        )
+        self.assertEqual(result.converted_amount, Decimal("92.4379456"))
+        self.assertEqual(str(result), "100.10 USD = 92.44 EUR")
+        self.assertFalse(hasattr(result, '__dict__'))
+        with self.assertRaises(AttributeError):
+            result.rate = Decimal("1")  # frozen, cached results are shared between callers
+
+    def test_weather_result_rendering(self):
+        result = WeatherResult(
+            city="Tokyo",
+            country="Japan",
+            date="2025-04-20",
+            temp_max=21.3,
+            temp_min=12.1,
+            condition="Clear sky",
+            source="test"
+        )
+        self.assertEqual(str(result), "Weather in Tokyo, Japan on 2025-04-20:\n"
+                                      " - Max Temp: 21.3°C\n"
+                                      " - Min Temp: 12.1°C\n"
+                                      " - Condition: Clear sky")
+        self.assertFalse(hasattr(result, '__dict__'))
+
+    def test_tool_error_rendering(self):
+        error = ToolError("Error: Could not find exchange rate for USD -> XXX")
+        self.assertEqual(str(error), "Error: Could not find exchange rate for USD -> XXX")
+        self.assertNotIsInstance(error, str)
+
+
+class StubRateHandler(BaseHTTPRequestHandler):
+    """
+    Serves open.er-api.com style responses; the first path segment picks the behaviour:
+    fast, slow (answers after 2s), partial (no VND rate), notime (no publication time),
+    fail (HTTP 500), ratelimited (HTTP 429) or unsupported (HTTP 404).
+    """
+
+    def do_GET(self):
+        mode = self.path.strip('/').split('/')[0]
+        if mode == 'fail':
+            self.send_error(500)
+            return
+        if mode == 'unsupported':
+            self.send_error(404)
+            return
+        if mode == 'ratelimited':
+            self.send_error(429)
+            return
+        if mode == 'slow':
+            time.sleep(2)
+        rates = {"EUR": 0.92} if mode == 'partial' else {"EUR": 0.92, "VND": 25400}
+        data = {"rates": rates} if mode == 'notime' else {"time_last_update_unix": 1745107200, "rates": rates}
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NamedProvider(OpenERAPIProvider):
+    def __init__(self, name, base_url):
+        super().__init__(base_url=base_url, timeout=5)
+        self.name = name
+
+
+class TestRateSource(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubRateHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def provider(self, mode):
+        return NamedProvider(mode, f"{self.url}/{mode}")
+
+    def test_fails_over_to_next_provider(self):
+        source = RateSource([self.provider('fail'), self.provider('fast')])
+        rates, _, name = source.get_rates('USD', 'EUR')
+        self.assertEqual(name, 'fast')
+        self.assertEqual(rates['EUR'], Decimal("0.92"))
+        self.assertEqual(source.stats['fail'].failures, 1)
+
+    def test_missing_publication_time_is_a_provider_error(self):
+        source = RateSource([self.provider('notime'), self.provider('fast')])
+        _, as_of, name = source.get_rates('USD', 'EUR')
+        self.assertEqual(name, 'fast')
+        self.assertEqual(as_of, datetime(2025, 4, 20, tzinfo=timezone.utc))
+        self.assertEqual(source.stats['notime'].failures, 1)
+
+    def test_hedges_slow_provider(self):
+        source = RateSource([self.provider('slow'), self.provider('fast')], hedge_after=0.05)
+        _, _, name = source.get_rates('USD', 'EUR')
+        self.assertEqual(name, 'fast')
+        self.assertEqual(source.stats['fast'].successes, 1)
+        self.assertEqual(source.stats['slow'].successes, 0)  # still in flight when the hedge won
+
+    def test_skips_provider_without_target_currency(self):
+        source = RateSource([self.provider('partial'), self.provider('fast')])
+        rates, _, name = source.get_rates('USD', 'VND')
+        self.assertEqual(name, 'fast')
+        self.assertEqual(rates['VND'], 25400)
+
+        source = RateSource([self.provider('partial')])
+        with self.assertRaises(UnsupportedCurrency):
+            source.get_rates('USD', 'VND')
+        self.assertEqual(source.stats['partial'].failures, 0)
+
+    def test_circuit_opens_after_failures(self):
+        source = RateSource([self.provider('fail'), self.provider('fast')], failure_threshold=2)
+        for _ in range(2):
+            source.get_rates('USD', 'EUR')
+        source.get_rates('USD', 'EUR')
+        self.assertEqual(source.stats['fail'].failures, 2)
+        self.assertEqual(source.stats['fast'].successes, 3)
+
+    def test_unsupported_currency_does_not_open_circuit(self):
+        source = RateSource([self.provider('unsupported')], failure_threshold=2)
+        for _ in range(3):
+            with self.assertRaises(UnsupportedCurrency):
+                source.get_rates('XXX', 'EUR')
+        self.assertEqual(source.stats['unsupported'].failures, 0)
+        self.assertFalse(source.stats['unsupported'].is_open(source.failure_threshold, source.reset_timeout))
+
+    def test_rate_limiting_opens_circuit(self):
+        source = RateSource([self.provider('ratelimited'), self.provider('fast')], failure_threshold=2)
+        for _ in range(3):
+            _, _, name = source.get_rates('USD', 'EUR')
+            self.assertEqual(name, 'fast')
+        self.assertEqual(source.stats['ratelimited'].failures, 2)
+        self.assertTrue(source.stats['ratelimited'].is_open(source.failure_threshold, source.reset_timeout))
+
+        with self.assertRaises(RuntimeError):  # a valid pair is not reported as an unknown currency
+            RateSource([self.provider('ratelimited')]).get_rates('USD', 'EUR')
+
+    def test_caches_rates_per_base_currency(self):
+        calls = []
+
+        class CountingProvider(FileRateProvider):
+            def get_rates(self, base):
+                calls.append(base)
+                return super().get_rates(base)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rates.json')
+            with open(path, 'w') as f:
+                json.dump({"USD": {"EUR": 0.92, "JPY": 142.5}}, f)
+            source = RateSource([CountingProvider(path)], cache_ttl=60)
+            self.assertEqual(source.get_rates('USD', 'EUR')[0]['EUR'], Decimal("0.92"))
+            self.assertEqual(source.get_rates('USD', 'JPY')[0]['JPY'], Decimal("142.5"))
+            self.assertEqual(calls, ['USD'])
+
+            with self.assertRaises(UnsupportedCurrency):  # a target missing from the cached rates is re-fetched
+                source.get_rates('USD', 'VND')
+            self.assertEqual(calls, ['USD', 'USD'])
+
+    def test_all_providers_fail(self):
+        source = RateSource([self.provider('fail')])
+        with self.assertRaises(RuntimeError):
+            source.get_rates('USD', 'EUR')
+
+    def test_file_provider(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rates.json')
+            with open(path, 'w') as f:
+                json.dump({"USD": {"EUR": 0.92}}, f)
+            rates, _, name = RateSource([FileRateProvider(path)]).get_rates('USD', 'EUR')
+            self.assertEqual(name, 'file')
+            self.assertEqual(rates, {"EUR": Decimal("0.92")})
+            with self.assertRaises(UnsupportedCurrency):
+                RateSource([FileRateProvider(path)]).get_rates('JPY', 'EUR')
+
+
+class TestAgentToolCache(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"DEEPSEEK_API_KEY": "test"}), \
+             mock.patch.object(run_agent, "OpenAI", mock.MagicMock()):
+            self.agent = run_agent.Agent()
+        self.calls = []
+
+        def make_tool(cache_ttl, cache_key=None, result=None):
+            @tool(name="lookup", cache_ttl=cache_ttl, cache_key=cache_key)
+            def lookup(code: str, amount: float) -> Any:
+                """Look something up.
+
+                Parameters:
+                    - code: A code
+                    - amount: An amount
+                """
+                self.calls.append((code, amount))
+                return result if result is not None else (code, amount)
+            return lookup
+
+        self.make_tool = make_tool
+
+    def test_repeat_call_is_served_from_cache(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=60))
+        first = self.agent.use_tool("lookup", code="USD", amount=100)
+        second = self.agent.use_tool("lookup", amount=100.0, code="USD")
+        self.assertIs(first, second)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.agent.cache_stats()["hits"], 1)
+        self.assertEqual(self.agent.cache_stats()["hit_rate"], 0.5)
+
+    def test_uncached_tool_always_runs(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=None))
+        for _ in range(2):
+            self.agent.use_tool("lookup", code="USD", amount=100)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.agent.cache_stats()["misses"], 0)
+
+    def test_string_results_are_cached(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=60, result="Hello, Bob."))
+        for _ in range(2):
+            self.assertEqual(self.agent.use_tool("lookup", code="USD", amount=100), "Hello, Bob.")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_errors_are_not_cached(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=60, result=ToolError("Error: something failed")))
+        for _ in range(2):
+            self.agent.use_tool("lookup", code="USD", amount=100)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cache_key_function(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=60, cache_key=lambda code, amount: (code.upper(), amount)))
+        self.agent.use_tool("lookup", code="usd", amount=100)
+        self.agent.use_tool("lookup", code="USD", amount=100)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_failing_cache_key_runs_tool_uncached(self):
+        self.agent.add_tools(self.make_tool(cache_ttl=60, cache_key=lambda code, amount: (code.upper(), amount)))
+        for _ in range(2):
+            self.assertEqual(self.agent.use_tool("lookup", code=None, amount=100), (None, 100))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_bad_arguments_reach_tool_error_handling(self):
+        self.agent.add_tools(tools.convert_currency)
+        self.agent.add_tools(tools.get_weather_by_city_and_date)
+        result = self.agent.use_tool("convert_currency", amount=100, from_currency="USD", to_currency=None)
+        self.assertIsInstance(result, ToolError)
+        result = self.agent.use_tool("get_weather_by_city_and_date", city=None, date="2025-04-20")
+        self.assertIsInstance(result, ToolError)
 
 
 if __name__ == '__main__':
@@ -1,10 +1,17 @@
-from modules import tool
+from modules import tool, ConversionResult, WeatherResult, ToolError
+from rate_providers import RateSource, OpenERAPIProvider, FrankfurterProvider, UnsupportedCurrency
+from decimal import Decimal
 import urllib.request
 import urllib.parse
 import json
 
-@tool()
-def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
+# exchange rate backends used by convert_currency, fastest first with hedging and failover;
+# rates are cached per base currency, so any amount or target from a recent base skips the network
+rate_source = RateSource([OpenERAPIProvider(), FrankfurterProvider()], cache_ttl=60)
+
+@tool(cache_ttl=60,
+      cache_key=lambda amount, from_currency, to_currency: (amount, from_currency.upper(), to_currency.upper()))
+def convert_currency(amount: float, from_currency: str, to_currency: str) -> ConversionResult | ToolError:
     """
     Converts currency using latest exchange rates.
 
@@ -14,27 +21,26 @@ def convert_currency(amount: float, from_currency: str, to_currency: str) -> flo
         - to_currency: Target currency code (e.g., EUR)  
     """
     try:
-        url = f"https://open.er-api.com/v6/latest/{from_currency.upper()}"
-        with urllib.request.urlopen(url) as response:
-            data = json.loads(response.read())
-
-        if 'rates' not in data:
-            return "Error: Could not fetch exchange rates"
-        
-        rate = data['rates'].get(to_currency.upper())
-        if not rate:
-            return f"Error: Could not find exchange rate for {from_currency.upper()} -> {to_currency.upper()}"
-        
-        converted_amount = amount * rate
-        
-        return f"{amount} {from_currency.upper()} = {converted_amount:.2f} {to_currency.upper()}"
-    
+        rates, as_of, source = rate_source.get_rates(from_currency.upper(), to_currency.upper())
+
+        return ConversionResult(
+            amount=Decimal(str(amount)),
+            from_currency=from_currency.upper(),
+            to_currency=to_currency.upper(),
+            rate=Decimal(rates[to_currency.upper()]),
+            as_of=as_of,
+            source=source
+        )
+
+    except UnsupportedCurrency:
+        return ToolError(f"Error: Could not find exchange rate for {from_currency.upper()} -> {to_currency.upper()}")
+
     except Exception as e:
-        return f"Error converting currency: {str(e)}"
+        return ToolError(f"Error converting currency: {str(e)}")
 
 
-@tool()
-def get_weather_by_city_and_date(city: str, date: str) -> str:
+@tool(cache_ttl=3600, cache_key=lambda city, date: (city.strip().lower(), date))
+def get_weather_by_city_and_date(city: str, date: str) -> WeatherResult | ToolError:
     """
     Fetches weather data (temperature and description) for a specific date and city.
 
@@ -43,7 +49,8 @@ def get_weather_by_city_and_date(city: str, date: str) -> str:
         - date: Date in YYYY-MM-DD format (e.g., "2025-04-20")
 
     Returns:
-        A string with weather info for the given date, including temperature and condition.
+        A WeatherResult with weather info for the given date, including temperature and condition,
+        or a ToolError if it could not be fetched.
     """
     # Weather code to description mapping
     weather_descriptions = {
@@ -86,7 +93,7 @@ def get_weather_by_city_and_date(city: str, date: str) -> str:
 
         results = geo_data.get("results")
         if not results:
-            return f"Error: Could not find location for '{city}'."
+            return ToolError(f"Error: Could not find location for '{city}'.")
 
         lat = results[0]["latitude"]
         lon = results[0]["longitude"]
@@ -107,7 +114,7 @@ def get_weather_by_city_and_date(city: str, date: str) -> str:
 
         daily = weather_data.get("daily", {})
         if not daily or date not in daily["time"]:
-            return f"No weather data found for {date} in {city_name}, {country}."
+            return ToolError(f"No weather data found for {date} in {city_name}, {country}.")
 
         i = daily["time"].index(date)
         temp_max = daily["temperature_2m_max"][i]
@@ -115,15 +122,18 @@ def get_weather_by_city_and_date(city: str, date: str) -> str:
         code = daily["weathercode"][i]
         description = weather_descriptions.get(code, f"Unknown condition (code {code})")
 
-        return (
-            f"Weather in {city_name}, {country} on {date}:\n"
-            f" - Max Temp: {temp_max}°C\n"
-            f" - Min Temp: {temp_min}°C\n"
-            f" - Condition: {description}"
+        return WeatherResult(
+            city=city_name,
+            country=country,
+            date=date,
+            temp_max=temp_max,
+            temp_min=temp_min,
+            condition=description,
+            source="open-meteo.com"
         )
 
     except Exception as e:
-        return f"Error fetching weather data: {str(e)}"
+        return ToolError(f"Error fetching weather data: {str(e)}")
     
 if __name__ == "__main__":
     convert_currency(100, 'USD', 'EUR')
\ No newline at end of file